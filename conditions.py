@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from threading import Lock
+
+from mytypes import ForecastDict, HourDict
+
+# Признаки погодных условий (битовая маска).
+DRY = 1
+RAIN = 2
+SNOW = 4
+THUNDER = 8
+HAIL = 16
+
+# Код 0 зарезервирован для неизвестных условий: ни один признак не задан,
+# поэтому такой час не считается сухим.
+UNKNOWN = 0
+
+# Каталог условий из examples/conditions.txt и их признаки.
+CONDITIONS: dict[str, int] = {
+    'clear': DRY,
+    'partly-cloudy': DRY,
+    'cloudy': DRY,
+    'overcast': DRY,
+    'drizzle': RAIN,
+    'light-rain': RAIN,
+    'rain': RAIN,
+    'moderate-rain': RAIN,
+    'heavy-rain': RAIN,
+    'continuous-heavy-rain': RAIN,
+    'showers': RAIN,
+    'wet-snow': RAIN | SNOW,
+    'light-snow': SNOW,
+    'snow': SNOW,
+    'snow-showers': SNOW,
+    'hail': HAIL,
+    'thunderstorm': THUNDER,
+    'thunderstorm-with-rain': THUNDER | RAIN,
+    'thunderstorm-with-hail': THUNDER | HAIL,
+}
+
+CODES: dict[str, int] = {
+    name: code for code, name in enumerate(CONDITIONS, start=1)
+}
+FLAGS: tuple[int, ...] = (0, *CONDITIONS.values())
+
+# Таблицы по коду условия: классификация часа — одно обращение по индексу.
+# FLAGS — битовая маска признаков, остальные — готовые проверки признака.
+IS_DRY: tuple[bool, ...] = tuple(bool(flags & DRY) for flags in FLAGS)
+IS_RAIN: tuple[bool, ...] = tuple(bool(flags & RAIN) for flags in FLAGS)
+IS_SNOW: tuple[bool, ...] = tuple(bool(flags & SNOW) for flags in FLAGS)
+IS_THUNDER: tuple[bool, ...] = tuple(
+    bool(flags & THUNDER) for flags in FLAGS
+)
+IS_HAIL: tuple[bool, ...] = tuple(bool(flags & HAIL) for flags in FLAGS)
+
+# Неизвестные условия за запуск; интернирование идёт при получении
+# данных в основном процессе, поэтому воркеры пула счётчик не меняют.
+unknown_conditions: Counter = Counter()
+_unknown_lock = Lock()
+
+
+def intern(condition: str) -> int:
+    """Код погодного условия.
+
+    Args:
+        condition (str): условие из ответа API, например `light-rain`.
+    Returns:
+        int: код условия из каталога или UNKNOWN.
+    """
+    if (code := CODES.get(condition)) is not None:
+        return code
+    with _unknown_lock:
+        if not unknown_conditions[condition]:
+            logging.warning(f'Неизвестное погодное условие: {condition}')
+        unknown_conditions[condition] += 1
+    return UNKNOWN
+
+
+def condition_code(hour: HourDict) -> int:
+    """Код условия часа: заранее вычисленный или полученный из строки.
+
+    Для отдельных часов вне расчёта; `DataCalculationTask.day_data`
+    читает `condition_code` напрямую.
+
+    Args:
+        hour (HourDict): данные о погоде за час.
+    Returns:
+        int: код условия.
+    """
+    if (code := hour.get('condition_code')) is not None:
+        return code
+    return intern(hour['condition'])
+
+
+def hours_with_codes(hours: list[HourDict]) -> list[HourDict]:
+    """Часы с кодами условий.
+
+    Часы из `DataFetchingTask` уже содержат коды и возвращаются как есть,
+    для остальных создаются копии с кодами.
+
+    Args:
+        hours (list[HourDict]): данные о погоде по часам.
+    Returns:
+        list[HourDict]: часы с ключом `condition_code`.
+    """
+    if not hours or 'condition_code' in hours[0]:
+        return hours
+    return [
+        {**hour, 'condition_code': intern(hour['condition'])}
+        for hour in hours
+    ]
+
+
+def intern_forecasts(forecasts: list[ForecastDict]):
+    """Добавление кода условия к каждому часу прогноза.
+
+    Args:
+        forecasts (list[ForecastDict]): прогнозы по дням.
+    """
+    for forecast in forecasts:
+        for hour in forecast.get('hours', ()):
+            hour['condition_code'] = intern(hour['condition'])
+
+
+def reset_unknown_conditions():
+    """Сброс счётчика неизвестных условий перед новым запуском."""
+    with _unknown_lock:
+        unknown_conditions.clear()
+
+
+def log_unknown_conditions():
+    """Запись в лог сводки по неизвестным погодным условиям."""
+    if unknown_conditions:
+        summary = ', '.join(
+            f'{name}: {count}'
+            for name, count in unknown_conditions.most_common()
+        )
+        logging.warning(f'Неизвестные погодные условия за запуск: {summary}')
@@ -1,7 +1,12 @@
 import logging
 import multiprocessing
+import sys
 from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+from conditions import log_unknown_conditions, reset_unknown_conditions
+from profiling import StageProfiler, profile_enabled
+from results_index import CityResultIndex
 from tasks import (
     DataAggregationTask,
     DataAnalyzingTask,
@@ -11,47 +16,66 @@ from tasks import (
 from utils import CITIES
 
 
-def forecast_weather():
+def forecast_weather(
+    profile: bool = False, index: Optional[CityResultIndex] = None
+):
     """
     Анализ погодных условий по городам
-    """
 
-    # Получаем данные по API
-    logging.info('Начинаем импорт json по API')
-    with ThreadPoolExecutor() as pool:
-        cities_data = pool.map(
-            DataFetchingTask.get_data, CITIES, chunksize=len(CITIES)
-        )
-    if not cities_data:
-        return
-    logging.info('Импорт json по API завершён удачно')
+    Args:
+        profile (bool): профилировать каждую стадию (cProfile, tracemalloc).
+        index (CityResultIndex): индекс, который пополняется результатами
+                                 расчёта для запросов по датам.
+    """
 
-    # Рассчитываем средние значения
-    logging.info('Начинаем расчёт средних значений для всех городов')
-    dct = DataCalculationTask()
-    pool = multiprocessing.Pool()
-    calculated_data = pool.map(dct.city_data, cities_data)
-    if not calculated_data:
-        logging.error(
-            'Расчёт средних значений для всех городов вернул пустой словарь!'
-        )
-        return
-    logging.info('Расчёт средних значений для всех городов завершён')
+    reset_unknown_conditions()
+    with StageProfiler(enabled=profile) as profiler:
+        # Получаем данные по API
+        logging.info('Начинаем импорт json по API')
+        with profiler.stage('fetching'), ThreadPoolExecutor() as pool:
+            cities_data = pool.map(
+                DataFetchingTask.get_data, CITIES, chunksize=len(CITIES)
+            )
+        if not cities_data:
+            return
+        logging.info('Импорт json по API завершён удачно')
+        log_unknown_conditions()
 
-    # Сохраняем данные в csv
-    logging.info('Сохраняем данные в файл')
-    write_to_csv = DataAggregationTask()
-    write_to_csv.to_csv(calculated_data)
-    logging.info('Сохранение данных в файл завершено')
+        # Рассчитываем средние значения
+        logging.info('Начинаем расчёт средних значений для всех городов')
+        dct = DataCalculationTask()
+        pool = multiprocessing.Pool()
+        try:
+            calculated_data = profiler.map(
+                pool, dct.city_data, cities_data, 'calculation'
+            )
+            if not calculated_data:
+                logging.error(
+                    'Расчёт средних значений для всех городов '
+                    'вернул пустой словарь!'
+                )
+                return
+            logging.info('Расчёт средних значений для всех городов завершён')
 
-    pool.close()
-    pool.join()
+            # Сохраняем данные в csv
+            logging.info('Сохраняем данные в файл')
+            write_to_csv = DataAggregationTask()
+            with profiler.stage('aggregation'):
+                write_to_csv.to_csv(calculated_data)
+            logging.info('Сохранение данных в файл завершено')
+        finally:
+            # Воркеры сохраняют профили при завершении, до объединения.
+            pool.close()
+            pool.join()
 
-    # Определяем лучший город
-    logging.info('Начинаем определение лучшего города')
-    dat = DataAnalyzingTask()
-    best_city = dat.rating(calculated_data)
-    logging.info('Определение лучшего города завершено')
+        # Определяем лучший город
+        logging.info('Начинаем определение лучшего города')
+        dat = DataAnalyzingTask()
+        with profiler.stage('analyzing'):
+            best_city = dat.rating(calculated_data)
+            if index is not None:
+                dat.build_index(calculated_data, index)
+        logging.info('Определение лучшего города завершено')
 
     return best_city
 
@@ -67,5 +91,5 @@ if __name__ == "__main__":
         )
     )
     logging.info('### СТАРТ ВЫПОЛНЕНИЯ ПРИЛОЖЕНИЯ ###')
-    print(forecast_weather())
+    print(forecast_weather(profile=profile_enabled(sys.argv[1:])))
     logging.info('### ЗАВЕРШЕНИЕ РАБОТЫ ПРИЛОЖЕНИЯ ###')
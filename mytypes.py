@@ -1,7 +1,11 @@
-from typing import TypedDict
+from typing import Optional, TypedDict
 
 
-class HourDict(TypedDict):
+class HourCodeDict(TypedDict, total=False):
+    condition_code: int
+
+
+class HourDict(HourCodeDict):
     hour: str
     hour_ts: int
     temp: int
@@ -51,7 +55,7 @@ class DateDict(TypedDict):
 
 class DateAVGDict(TypedDict):
     date: str
-    avg_temp: float
+    avg_temp: Optional[float]
     count_dry: float
 
 
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import cProfile
+import contextlib
+import glob
+import logging
+import os
+import pickle
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from multiprocessing import util
+from multiprocessing.pool import Pool
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+PROFILE_ENV = 'FORECAST_PROFILE'
+PROFILE_DIR = 'profile'
+TOP_ALLOCATIONS = 25
+COLLAPSED_FILE = 'profile.collapsed'
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# Код самого профайлера не показывается в отчётах.
+HIDDEN_FILES = (__file__, contextlib.__file__)
+
+# Профайлеры стадий внутри процесса-воркера: имя стадии -> состояние.
+_worker_state: dict[str, _WorkerState] = {}
+
+
+def profile_enabled(argv: Optional[list[str]] = None) -> bool:
+    """Включён ли режим профилирования.
+
+    Args:
+        argv (list[str]): аргументы командной строки.
+    Returns:
+        bool: True, если передан `--profile` или переменная окружения
+              FORECAST_PROFILE равна 1, true, yes или on.
+    """
+    if argv and '--profile' in argv:
+        return True
+    return os.environ.get(PROFILE_ENV, '').strip().lower() in TRUE_VALUES
+
+
+def _write_allocations(path: str, stats: Counter, title: str):
+    """Запись отчёта о самых больших выделениях памяти.
+
+    Args:
+        path (str): путь к файлу отчёта.
+        stats (Counter): размер выделенной памяти по строкам кода.
+        title (str): заголовок отчёта.
+    """
+    with open(path, mode='w', encoding='utf-8') as w_file:
+        w_file.write(f'{title}\n')
+        for place, size in stats.most_common(TOP_ALLOCATIONS):
+            w_file.write(f'{size / 1024:10.1f} KiB  {place}\n')
+
+
+def _allocations(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+) -> Counter:
+    """Прирост памяти по строкам кода между двумя снимками."""
+    own = tuple(
+        tracemalloc.Filter(False, filename)
+        for filename in (tracemalloc.__file__, *HIDDEN_FILES)
+    )
+    stats: Counter = Counter()
+    diffs = after.filter_traces(own).compare_to(
+        before.filter_traces(own), 'lineno'
+    )
+    for diff in diffs:
+        if diff.size_diff > 0:
+            stats[str(diff.traceback)] += diff.size_diff
+    return stats
+
+
+class _WorkerState:
+    """Профайлер и статистика памяти одной стадии в процессе-воркере."""
+
+    def __init__(self, name: str, out_dir: str):
+        self.name = name
+        self.out_dir = out_dir
+        self.profile = cProfile.Profile()
+        self.allocations: Counter = Counter()
+        self.calls = 0
+        # Воркеры пула завершаются через os._exit, atexit не сработает.
+        util.Finalize(None, self.dump, exitpriority=10)
+
+    def dump(self):
+        """Сохранение статистики воркера при завершении процесса."""
+        prefix = os.path.join(
+            self.out_dir, f'{self.name}-worker-{os.getpid()}'
+        )
+        self.profile.dump_stats(f'{prefix}.pstats')
+        _write_allocations(
+            f'{prefix}-alloc.txt', self.allocations,
+            f'{self.name}, воркер {os.getpid()}: суммарный прирост памяти '
+            f'за все вызовы (вызовов: {self.calls})'
+        )
+
+
+class ProfiledTask:
+    """Обёртка задачи пула, профилирующая её внутри воркера.
+
+    Результат задачи возвращается уже сериализованным, чтобы в профиль
+    воркера попадала и стоимость pickle.
+    """
+
+    def __init__(self, func: Callable, name: str, out_dir: str):
+        self.func = func
+        self.name = name
+        self.out_dir = out_dir
+
+    def __call__(self, arg: Any) -> bytes:
+        if (state := _worker_state.get(self.name)) is None:
+            state = _worker_state[self.name] = _WorkerState(
+                self.name, self.out_dir
+            )
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        state.profile.enable()
+        try:
+            result = self.func(arg)
+            return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        finally:
+            state.profile.disable()
+            state.calls += 1
+            state.allocations.update(
+                _allocations(before, tracemalloc.take_snapshot())
+            )
+
+
+class _ThreadProfiles:
+    """Профайлеры потоков, запущенных во время стадии.
+
+    cProfile до Python 3.12 профилирует только вызывающий поток, поэтому
+    каждый новый поток при первом вызове включает собственный профайлер.
+    """
+
+    def __init__(self):
+        self.profiles: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, frame, event, arg):
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append(profile)
+        # Заменяет этот хук профайлером cProfile для текущего потока.
+        profile.enable()
+
+
+class StageProfiler:
+    """Профилирование стадий расчёта через cProfile и tracemalloc.
+
+    В выключенном состоянии стадии выполняются без накладных расходов.
+    Используется как контекстный менеджер: объединение профилей
+    выполняется и при досрочном выходе или ошибке.
+    """
+
+    def __init__(self, enabled: bool = False, out_dir: str = PROFILE_DIR):
+        self.enabled = enabled
+        self.out_dir = out_dir
+        self.stages: list[str] = []
+        if enabled:
+            os.makedirs(out_dir, exist_ok=True)
+            # Профили воркеров прошлого запуска попали бы в объединение.
+            for path in glob.glob(self._path('*-worker-*')):
+                os.remove(path)
+
+    def __enter__(self) -> StageProfiler:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.out_dir, name)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Профилирование одной стадии в текущем процессе.
+
+        Профилируется и работа потоков, запущенных внутри стадии;
+        их статистика объединяется со статистикой стадии.
+
+        Args:
+            name (str): имя стадии, используется в именах файлов.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        # С Python 3.12 cProfile сам профилирует все потоки.
+        threads = _ThreadProfiles() if sys.version_info < (3, 12) else None
+        if threads:
+            threading.setprofile(threads)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if threads:
+                threading.setprofile(None)  # type: ignore[arg-type]
+            after = tracemalloc.take_snapshot()
+            if started:
+                tracemalloc.stop()
+            stats = pstats.Stats(profile)
+            for thread_profile in threads.profiles if threads else ():
+                stats.add(thread_profile)
+            stats.dump_stats(self._path(f'{name}.pstats'))
+            _write_allocations(
+                self._path(f'{name}-alloc.txt'),
+                _allocations(before, after),
+                f'{name}: прирост памяти за стадию'
+            )
+            self.stages.append(name)
+            logging.info(f'Профиль стадии {name} сохранён в {self.out_dir}')
+
+    def map(
+        self, pool: Pool, func: Callable, iterable: Iterable, name: str
+    ) -> list:
+        """`Pool.map` с профилированием стадии и в воркерах.
+
+        Args:
+            pool (Pool): пул процессов.
+            func (Callable): задача для каждого элемента.
+            iterable (Iterable): данные для задачи.
+            name (str): имя стадии.
+        Returns:
+            list: результаты задачи.
+        """
+        if not self.enabled:
+            return pool.map(func, iterable)
+        with self.stage(name):
+            return [
+                pickle.loads(data)
+                for data in pool.map(
+                    ProfiledTask(func, f'{name}-task', self.out_dir),
+                    iterable
+                )
+            ]
+
+    def finish(self):
+        """Объединение профилей воркеров и запись collapsed-стеков.
+
+        Вызывается после завершения пула процессов, когда воркеры уже
+        сохранили свою статистику.
+        """
+        if not self.enabled:
+            return
+
+        profiles: list[tuple[str, pstats.Stats]] = []
+        for name in self.stages:
+            profiles.append(
+                (name, pstats.Stats(self._path(f'{name}.pstats')))
+            )
+            workers = sorted(
+                glob.glob(self._path(f'{name}-task-worker-*.pstats'))
+            )
+            if workers:
+                merged = pstats.Stats(*workers)
+                merged.dump_stats(self._path(f'{name}-task.pstats'))
+                profiles.append((f'{name}-task', merged))
+
+        with open(
+            self._path(COLLAPSED_FILE), mode='w', encoding='utf-8'
+        ) as w_file:
+            for name, stats in profiles:
+                for stack, value in collapse(stats).items():
+                    w_file.write(f'{name};{stack} {value}\n')
+        logging.info(f'Collapsed-стеки сохранены в {self.out_dir}')
+
+
+def _hidden(func: tuple[str, int, str]) -> bool:
+    """Кадр профайлера: его код, contextlib или методы cProfile."""
+    filename, _, name = func
+    return filename in HIDDEN_FILES or '_lsprof.Profiler' in name
+
+
+def _frame(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def collapse(stats: pstats.Stats) -> Counter:
+    """Восстановление стеков вызовов из графа pstats.
+
+    cProfile хранит только пары вызывающий-вызываемый, поэтому собственное
+    время функции распределяется по путям пропорционально времени рёбер.
+    Кадры самого профайлера пропускаются вместе с их собственным временем.
+
+    Args:
+        stats (pstats.Stats): статистика профиля.
+    Returns:
+        Counter: стек через `;` -> собственное время в микросекундах.
+    """
+    raw = stats.stats  # type: ignore[attr-defined]
+    callees: dict[tuple, dict[tuple, float]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            callees.setdefault(caller, {})[func] = edge_ct
+
+    result: Counter = Counter()
+
+    def walk(func: tuple, share: float, path: list[str], seen: set):
+        _, _, own, _, _ = raw[func]
+        if visible := not _hidden(func):
+            path.append(_frame(func))
+            if (value := int(own * share * 1e6)) > 0:
+                result[';'.join(path)] += value
+        for callee, edge_ct in callees.get(func, {}).items():
+            # Отбрасываем пути короче микросекунды и рекурсию.
+            if callee in seen or share * edge_ct < 1e-6:
+                continue
+            seen.add(callee)
+            walk(callee, share * edge_ct / raw[callee][3], path, seen)
+            seen.discard(callee)
+        if visible:
+            path.pop()
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, 1.0, [], {func})
+    return result
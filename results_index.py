@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
+
+from mytypes import CityResultDict, DateAVGDict
+
+INF = float('inf')
+
+# Значения дня в индексе: (средняя температура, сухие часы).
+Values = tuple[float, float]
+
+
+class SortedList:
+    """Отсортированный список из блоков ограниченного размера.
+
+    Вставка и удаление сдвигают только один блок, поэтому стоят
+    O(log n + LOAD), а не O(n), как у `insort` в обычный список.
+    """
+
+    LOAD = 512
+
+    def __init__(self, items: Iterable = ()):
+        values = sorted(items)
+        self._blocks: list[list] = [
+            values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)
+        ]
+        self._maxes: list = [block[-1] for block in self._blocks]
+        self._len = len(values)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for block in self._blocks:
+            yield from block
+
+    def __reversed__(self) -> Iterator:
+        for block in reversed(self._blocks):
+            yield from reversed(block)
+
+    def add(self, item: Any):
+        """Вставка элемента с сохранением порядка."""
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            self._len = 1
+            return
+        number = min(bisect_left(self._maxes, item), len(self._blocks) - 1)
+        block = self._blocks[number]
+        insort(block, item)
+        self._maxes[number] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.LOAD:
+            tail = block[self.LOAD:]
+            del block[self.LOAD:]
+            self._blocks.insert(number + 1, tail)
+            self._maxes[number] = block[-1]
+            self._maxes.insert(number + 1, tail[-1])
+
+    def remove(self, item: Any):
+        """Удаление элемента.
+
+        Raises:
+            ValueError: элемента нет в списке.
+        """
+        number = bisect_left(self._maxes, item)
+        if number < len(self._blocks):
+            block = self._blocks[number]
+            position = bisect_left(block, item)
+            if position < len(block) and block[position] == item:
+                del block[position]
+                self._len -= 1
+                if block:
+                    self._maxes[number] = block[-1]
+                else:
+                    del self._blocks[number]
+                    del self._maxes[number]
+                return
+        raise ValueError(f'{item!r} нет в списке')
+
+    def irange(self, low: Any, high: Any) -> Iterator:
+        """Элементы в диапазоне [low, high] по возрастанию."""
+        number = bisect_left(self._maxes, low)
+        if number >= len(self._blocks):
+            return
+        start = bisect_left(self._blocks[number], low)
+        for block in self._blocks[number:]:
+            if block[-1] <= high:
+                yield from block[start:]
+            else:
+                yield from block[start:bisect_right(block, high)]
+                return
+            start = 0
+
+
+class _DateIndex:
+    """Записи одной даты.
+
+    `by_temp` — (температура, сухие часы, город) по возрастанию;
+    `by_dry` — для каждого количества сухих часов (температура, город).
+    """
+
+    def __init__(
+        self, by_temp: Iterable = (), by_dry: Optional[dict] = None
+    ):
+        self.by_temp = SortedList(by_temp)
+        self.by_dry: dict[float, SortedList] = {
+            dry: SortedList(entries)
+            for dry, entries in (by_dry or {}).items()
+        }
+
+    def add(self, city: str, temp: float, dry: float):
+        self.by_temp.add((temp, dry, city))
+        if (group := self.by_dry.get(dry)) is None:
+            group = self.by_dry[dry] = SortedList()
+        group.add((temp, city))
+
+    def remove(self, city: str, temp: float, dry: float):
+        self.by_temp.remove((temp, dry, city))
+        self.by_dry[dry].remove((temp, city))
+        if not self.by_dry[dry]:
+            del self.by_dry[dry]
+
+
+class CityResultIndex:
+    """Индекс по рассчитанным данным городов.
+
+    Для каждой даты хранятся записи, отсортированные по температуре, и
+    группы по количеству сухих часов, для каждого города — данные по
+    датам. Запросы по диапазону выполняются бинарным поиском, новые
+    результаты добавляются без перестроения индекса.
+
+    Дни без данных не попадают в запросы по дате, но в `dry_every_day`
+    считаются днями без сухих часов.
+    """
+
+    def __init__(self):
+        # Город -> дата -> (температура, сухие часы) или None без данных.
+        self._cities: dict[str, dict[str, Optional[Values]]] = {}
+        self._dates: dict[str, _DateIndex] = {}
+        self._min_dry = SortedList()
+
+    @classmethod
+    def from_results(
+        cls, results: Iterable[CityResultDict]
+    ) -> CityResultIndex:
+        """Построение индекса по всем результатам с одной сортировкой.
+
+        Если город встречается несколько раз, берутся последние данные.
+
+        Args:
+            results (Iterable[CityResultDict]): рассчитанные данные городов.
+        Returns:
+            CityResultIndex: индекс.
+        """
+        index = cls()
+        index._load(results)
+        return index
+
+    def _load(self, results: Iterable[CityResultDict]):
+        """Заполнение пустого индекса с одной сортировкой каждого списка."""
+        for city_data in results:
+            self._cities[city_data['city']] = self._days(city_data)
+
+        by_temp: dict[str, list] = {}
+        by_dry: dict[str, dict[float, list]] = {}
+        min_dry: list = []
+        for city, dates in self._cities.items():
+            for date, values in dates.items():
+                if values is not None:
+                    temp, dry = values
+                    by_temp.setdefault(date, []).append((temp, dry, city))
+                    by_dry.setdefault(date, {}).setdefault(dry, []).append(
+                        (temp, city)
+                    )
+            if dates:
+                min_dry.append((self._city_min_dry(dates), city))
+
+        self._dates = {
+            date: _DateIndex(entries, by_dry[date])
+            for date, entries in by_temp.items()
+        }
+        self._min_dry = SortedList(min_dry)
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._cities
+
+    @staticmethod
+    def _days(
+        city_data: CityResultDict
+    ) -> dict[str, Optional[Values]]:
+        """Копия данных города по датам.
+
+        Raises:
+            ValueError: дата встречается в данных города несколько раз.
+        """
+        dates: dict[str, Optional[Values]] = {}
+        for day in city_data['data']:
+            if day['date'] in dates:
+                raise ValueError(
+                    f"Дата {day['date']} повторяется "
+                    f"в данных города {city_data['city']}"
+                )
+            # avg_temp равна None в дни без данных с 9 до 19 часов.
+            temp = day['avg_temp']
+            dates[day['date']] = (
+                None if temp is None else (temp, day['count_dry'])
+            )
+        return dates
+
+    @staticmethod
+    def _city_min_dry(
+        dates: dict[str, Optional[Values]]
+    ) -> float:
+        return min(0 if values is None else values[1]
+                   for values in dates.values())
+
+    def remove(self, city: str):
+        """Удаление города из индекса.
+
+        Args:
+            city (str): имя города.
+        """
+        if (dates := self._cities.pop(city, None)) is None:
+            return
+        for date, values in dates.items():
+            if values is not None:
+                self._dates[date].remove(city, *values)
+        if dates:
+            self._min_dry.remove((self._city_min_dry(dates), city))
+
+    def add(self, city_data: CityResultDict):
+        """Добавление или обновление данных города.
+
+        Индекс хранит копию значений, поэтому данные можно менять на месте
+        и добавлять повторно.
+
+        Args:
+            city_data (CityResultDict): рассчитанные данные города.
+        Raises:
+            ValueError: дата встречается в данных города несколько раз.
+        """
+        city = city_data['city']
+        dates = self._days(city_data)
+        self.remove(city)
+        for date, values in dates.items():
+            if values is None:
+                continue
+            if (index := self._dates.get(date)) is None:
+                index = self._dates[date] = _DateIndex()
+            index.add(city, *values)
+        self._cities[city] = dates
+        if dates:
+            self._min_dry.add((self._city_min_dry(dates), city))
+
+    def update(self, results: Iterable[CityResultDict]):
+        """Добавление результатов: в пустой индекс одной сортировкой,
+        иначе по одному городу.
+
+        Args:
+            results (Iterable[CityResultDict]): рассчитанные данные городов.
+        """
+        if not self._cities:
+            self._load(results)
+            return
+        for city_data in results:
+            self.add(city_data)
+
+    def city(self, city: str) -> dict[str, DateAVGDict]:
+        """Данные города по датам, кроме дней без данных.
+
+        Args:
+            city (str): имя города.
+        Returns:
+            dict: дата -> данные за день.
+        """
+        return {
+            date: {'date': date, 'avg_temp': values[0],
+                   'count_dry': values[1]}
+            for date, values in self._cities.get(city, {}).items()
+            if values is not None
+        }
+
+    def temp_range(
+        self, date: str, low: float = -INF, high: float = INF
+    ) -> list[str]:
+        """Города со средней температурой в диапазоне [low, high].
+
+        Args:
+            date (str): дата.
+            low (float): нижняя граница температуры.
+            high (float): верхняя граница температуры.
+        Returns:
+            list[str]: города по возрастанию температуры.
+        """
+        if (index := self._dates.get(date)) is None:
+            return []
+        return [
+            city for _, _, city in index.by_temp.irange((low,), (high, INF))
+        ]
+
+    def dry_range(
+        self, date: str, low: float = -INF, high: float = INF
+    ) -> list[str]:
+        """Города с количеством сухих часов в диапазоне [low, high].
+
+        Args:
+            date (str): дата.
+            low (float): нижняя граница сухих часов.
+            high (float): верхняя граница сухих часов.
+        Returns:
+            list[str]: города по возрастанию сухих часов, затем температуры.
+        """
+        if (index := self._dates.get(date)) is None:
+            return []
+        return [
+            city
+            for dry in sorted(index.by_dry)
+            if low <= dry <= high
+            for _, city in index.by_dry[dry]
+        ]
+
+    def warmest(
+        self, date: str, limit: int = 10, min_dry: Optional[float] = None
+    ) -> list[str]:
+        """Самые тёплые города за дату.
+
+        С `min_dry` объединяются группы по сухим часам не меньше порога;
+        групп не больше числа часов в периоде, поэтому запрос читает
+        только `limit` записей из каждой.
+
+        Args:
+            date (str): дата.
+            limit (int): количество городов.
+            min_dry (float): минимальное количество сухих часов.
+        Returns:
+            list[str]: города по убыванию температуры.
+        """
+        if (index := self._dates.get(date)) is None:
+            return []
+        if min_dry is None:
+            entries = ((temp, city) for temp, _, city in
+                       reversed(index.by_temp))
+        else:
+            entries = merge(
+                *(reversed(group) for dry, group in index.by_dry.items()
+                  if dry >= min_dry),
+                reverse=True
+            )
+        return [city for _, city in islice(entries, limit)]
+
+    def dry_every_day(self, min_dry: float) -> list[str]:
+        """Города, где каждый день не меньше min_dry сухих часов.
+
+        День без данных считается днём без сухих часов.
+
+        Args:
+            min_dry (float): минимальное количество сухих часов.
+        Returns:
+            list[str]: города по возрастанию минимума сухих часов.
+        """
+        return [city for _, city in self._min_dry.irange((min_dry,), (INF,))]
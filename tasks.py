@@ -4,8 +4,10 @@ import csv
 import logging
 from dataclasses import dataclass
 from threading import Thread, Lock
+from typing import Optional
 
 from api_client import YandexWeatherAPI
+from conditions import IS_DRY, hours_with_codes, intern_forecasts
 from mytypes import (
     CityAVGDict,
     CityDict,
@@ -13,6 +15,7 @@ from mytypes import (
     DateAVGDict,
     DateDict
 )
+from results_index import CityResultIndex
 
 
 class DataFetchingTask:
@@ -29,6 +32,7 @@ class DataFetchingTask:
         """
         yw = YandexWeatherAPI()
         if response := yw.get_forecasting(city):
+            intern_forecasts(response['forecasts'])
             return {'city_name': city, 'forecasts': response['forecasts']}
 
 
@@ -49,25 +53,25 @@ class DataCalculationTask:
             date (dict): дата и  список словарей данных за день по часам.
         Returns:
             dict: {'date': date, 'avg_temp': avg_temp, 'count_dry': count_dry}.
+                  Без данных с 9 до 19 часов avg_temp равна None.
         """
 
         not_full_data: DateAVGDict = {
-            'date': date['date'], 'avg_temp': 0, 'count_dry': 0
+            'date': date['date'], 'avg_temp': None, 'count_dry': 0
         }
         if not date.get('hours'):
             return not_full_data
 
-        dry = ('clear', 'partly-cloudy', 'cloudy', 'overcast')
-
         sum_temp = num_temp = count_dry = 0
-        for hour in date['hours']:
-            if int(hour['hour']) < self.HOUR_MIN:
+        for hour in hours_with_codes(date['hours']):
+            hour_number = int(hour['hour'])
+            if hour_number < self.HOUR_MIN:
                 continue
-            elif int(hour['hour']) > self.HOUR_MAX:
+            elif hour_number > self.HOUR_MAX:
                 break
             sum_temp += hour['temp']
             num_temp += 1
-            if hour['condition'] in dry:
+            if IS_DRY[hour['condition_code']]:
                 count_dry += 1
 
         if num_temp:
@@ -208,6 +212,7 @@ class DataAnalyzingTask:
         self.best_city: City = City(
             {'city': 'ZZ', 'avg': {"avg_temp": -99, "avg_dry": -99}}
         )
+        self.index: Optional[CityResultIndex] = None
 
     def compare(self, city: City):
         """Поиск города с лучшими параметрами.
@@ -237,3 +242,24 @@ class DataAnalyzingTask:
             )
 
         return self.best_city
+
+    def build_index(
+        self,
+        cities: list[CityResultDict],
+        index: Optional[CityResultIndex] = None
+    ) -> CityResultIndex:
+        """Индекс для запросов по датам: диапазоны температуры и сухих
+        часов, самые тёплые города, города с сухими часами каждый день.
+
+        Args:
+            cities (list[CityResultDict]): рассчитанные данные городов.
+            index (CityResultIndex): индекс для пополнения, по умолчанию
+                                     строится новый.
+        Returns:
+            CityResultIndex: индекс с данными городов.
+        """
+
+        logging.info(f'Строим индекс по {len(cities)} городам.')
+        self.index = CityResultIndex() if index is None else index
+        self.index.update(cities)
+        return self.index
@@ -132,3 +132,40 @@ def for_rating():
             'city': 'city_cold', 'avg': {"avg_temp": 10.1, "avg_dry": 3.3}
         }
     ]
+
+
+@pytest.fixture()
+def city_result():
+    """Фабрика рассчитанных данных города.
+
+    days — список кортежей (дата, средняя температура, сухие часы);
+    температура None — день без данных.
+    """
+    def make(city, days):
+        return {
+            'city': city,
+            'data': [
+                {'date': date, 'avg_temp': temp, 'count_dry': dry}
+                for date, temp, dry in days
+            ],
+            'avg': {},
+        }
+    return make
+
+
+@pytest.fixture()
+def results_index(city_result):
+    """Индекс по трём городам за два дня; у LONDON второй день без данных."""
+    from results_index import CityResultIndex
+
+    index = CityResultIndex()
+    index.add(city_result(
+        'MOSCOW', [('2022-05-28', 15.0, 9), ('2022-05-29', 17.0, 8)]
+    ))
+    index.add(city_result(
+        'CAIRO', [('2022-05-28', 33.0, 11), ('2022-05-29', 34.0, 11)]
+    ))
+    index.add(city_result(
+        'LONDON', [('2022-05-28', 18.0, 9), ('2022-05-29', None, 0)]
+    ))
+    return index
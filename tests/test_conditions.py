@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import conditions
+from conditions import (
+    IS_DRY,
+    IS_HAIL,
+    IS_RAIN,
+    IS_SNOW,
+    IS_THUNDER,
+    UNKNOWN,
+    intern,
+    hours_with_codes,
+    intern_forecasts,
+    log_unknown_conditions,
+    reset_unknown_conditions
+)
+
+CONDITIONS_FILE = Path(__file__).parent.parent / 'examples' / 'conditions.txt'
+
+
+def test_catalog():
+    # GIVEN список условий из examples/conditions.txt.
+    # THEN каждое условие есть в каталоге и правильно классифицировано.
+
+    lines = CONDITIONS_FILE.read_text(encoding='utf-8').splitlines()[1:]
+    names = [line.split(' — ')[0] for line in lines if line]
+    for name in names:
+        assert intern(name) != UNKNOWN, (
+            f'Проверьте, что условие {name} есть в каталоге.'
+        )
+    dry = [name for name in names if IS_DRY[intern(name)]]
+    assert dry == ['clear', 'partly-cloudy', 'cloudy', 'overcast'], (
+        'Проверьте, что сухими считаются только условия без осадков.'
+    )
+    code = intern('thunderstorm-with-rain')
+    assert IS_THUNDER[code] and IS_RAIN[code] and not IS_SNOW[code], (
+        'Проверьте признаки условия `thunderstorm-with-rain`.'
+    )
+    assert IS_RAIN[intern('wet-snow')] and IS_SNOW[intern('wet-snow')], (
+        'Проверьте признаки условия `wet-snow`.'
+    )
+    code = intern('thunderstorm-with-hail')
+    assert IS_HAIL[code] and IS_THUNDER[code] and not IS_DRY[code], (
+        'Проверьте признаки условия `thunderstorm-with-hail`.'
+    )
+
+
+def test_unknown_condition(monkeypatch, caplog, get_datacalculationtask):
+    # GIVEN в данных встречается условие, которого нет в каталоге.
+    # THEN оно учитывается в счётчике и не считается сухим.
+
+    monkeypatch.setattr(conditions, 'unknown_conditions', conditions.Counter())
+    forecasts = [{
+        'date': '2022-05-26',
+        'hours': [
+            {'hour': '9', 'temp': 15, 'condition': 'sandstorm'},
+            {'hour': '10', 'temp': 15, 'condition': 'clear'},
+            {'hour': '11', 'temp': 15, 'condition': 'sandstorm'},
+        ]
+    }]
+    intern_forecasts(forecasts)
+    assert conditions.unknown_conditions == {'sandstorm': 2}, (
+        'Проверьте, что неизвестные условия учитываются в счётчике.'
+    )
+    result = get_datacalculationtask.day_data(forecasts[0])
+    assert result['count_dry'] == 1, (
+        'Проверьте, что неизвестное условие не считается сухим.'
+    )
+    log_unknown_conditions()
+    assert 'sandstorm: 2' in caplog.text, (
+        'Проверьте, что сводка по неизвестным условиям пишется в лог.'
+    )
+    reset_unknown_conditions()
+    assert not conditions.unknown_conditions, (
+        'Проверьте, что `reset_unknown_conditions` очищает счётчик.'
+    )
+
+
+def test_hours_with_codes():
+    # GIVEN часы из ответа API без кодов и часы после DataFetchingTask.
+    # THEN для первых создаются копии с кодами, вторые не копируются.
+
+    raw = [{'hour': '9', 'temp': 15, 'condition': 'clear'}]
+    hours = hours_with_codes(raw)
+    assert hours[0]['condition_code'] == intern('clear'), (
+        'Проверьте, что `hours_with_codes` добавляет коды условий.'
+    )
+    assert 'condition_code' not in raw[0], (
+        'Проверьте, что `hours_with_codes` не меняет исходные данные.'
+    )
+    assert hours_with_codes(hours) is hours, (
+        'Проверьте, что часы с кодами возвращаются без копирования.'
+    )
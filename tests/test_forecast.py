@@ -29,7 +29,9 @@ def test_empty_data(get_datacalculationtask, incomplete_data, empty_data):
     data = (incomplete_data, empty_data)
     for dt in data:
         result = get_datacalculationtask.day_data(dt)
-        assert result == {'date': dt['date'], 'avg_temp': 0, 'count_dry': 0}, (
+        assert result == {
+            'date': dt['date'], 'avg_temp': None, 'count_dry': 0
+        }, (
             'Проверьте, что `day_data` отдаёт только дату, когда нет данных '
             'о погоде с 9 до 19 ч или данные о погоде в этот день отсутствуют'
             ' совсем.'
@@ -0,0 +1,90 @@
+import multiprocessing
+import pstats
+
+from profiling import COLLAPSED_FILE, StageProfiler, profile_enabled
+from tasks import DataAggregationTask, DataCalculationTask
+
+
+def test_profile_enabled(monkeypatch):
+    # GIVEN флаг командной строки или переменная окружения.
+    # THEN режим профилирования включается любым из них.
+
+    monkeypatch.delenv('FORECAST_PROFILE', raising=False)
+    assert not profile_enabled([]), (
+        'Проверьте, что профилирование по умолчанию выключено.'
+    )
+    assert profile_enabled(['--profile']), (
+        'Проверьте, что `--profile` включает профилирование.'
+    )
+    for value in ('1', 'true', 'Yes', 'on'):
+        monkeypatch.setenv('FORECAST_PROFILE', value)
+        assert profile_enabled([]), (
+            'Проверьте, что FORECAST_PROFILE включает профилирование.'
+        )
+    for value in ('', '0', 'false', 'no', 'off'):
+        monkeypatch.setenv('FORECAST_PROFILE', value)
+        assert not profile_enabled([]), (
+            f'Проверьте, что FORECAST_PROFILE={value} не включает '
+            'профилирование.'
+        )
+
+
+def test_profiled_map(tmp_path, initial_city_data):
+    # GIVEN расчёт по городу в пуле процессов с профилированием.
+    # THEN результат не меняется, а профили стадии, воркеров и
+    #      collapsed-стеки сохраняются в каталог профиля.
+
+    dct = DataCalculationTask()
+    profiler = StageProfiler(enabled=True, out_dir=str(tmp_path))
+    pool = multiprocessing.Pool(2)
+    result = profiler.map(
+        pool, dct.city_data, [initial_city_data], 'calculation'
+    )
+    pool.close()
+    pool.join()
+    profiler.finish()
+
+    assert result == [DataCalculationTask().city_data(initial_city_data)], (
+        'Проверьте, что профилирование не меняет результат расчёта.'
+    )
+    for name in ('calculation.pstats', 'calculation-alloc.txt',
+                 'calculation-task.pstats', COLLAPSED_FILE):
+        assert (tmp_path / name).exists(), f'Не найден файл {name}.'
+    task_stats = pstats.Stats(str(tmp_path / 'calculation-task.pstats'))
+    assert any(
+        func[2] == 'day_data' for func in task_stats.stats
+    ), 'Проверьте, что в профиль воркеров попадает `day_data`.'
+    collapsed = (tmp_path / COLLAPSED_FILE).read_text(encoding='utf-8')
+    assert 'calculation-task;' in collapsed, (
+        'Проверьте, что collapsed-стеки содержат стеки воркеров.'
+    )
+    assert 'profiling.py' not in collapsed, (
+        'Проверьте, что collapsed-стеки не содержат кадров профайлера.'
+    )
+    assert 'contextlib.py' not in collapsed, (
+        'Проверьте, что collapsed-стеки не содержат кадров contextlib.'
+    )
+    for report in tmp_path.glob('*-alloc.txt'):
+        assert 'profiling.py' not in report.read_text(encoding='utf-8'), (
+            'Проверьте, что отчёты о памяти не содержат кода профайлера.'
+        )
+
+
+def test_profiled_threads(tmp_path, monkeypatch, initial_city_data):
+    # GIVEN стадия записи в csv, которая пишет строки в отдельных потоках.
+    # THEN в профиль стадии попадает работа потоков, а при выходе из
+    #      контекста сохраняются collapsed-стеки.
+
+    monkeypatch.chdir(tmp_path)
+    city = DataCalculationTask().city_data(initial_city_data)
+    with StageProfiler(enabled=True, out_dir='profile') as profiler:
+        with profiler.stage('aggregation'):
+            DataAggregationTask().to_csv([city, city])
+
+    stats = pstats.Stats(str(tmp_path / 'profile' / 'aggregation.pstats'))
+    assert any(
+        func[2] == 'write_to_csv' for func in stats.stats
+    ), 'Проверьте, что в профиль стадии попадает работа потоков.'
+    assert (tmp_path / 'profile' / COLLAPSED_FILE).exists(), (
+        'Проверьте, что `StageProfiler` сохраняет collapsed-стеки при выходе.'
+    )
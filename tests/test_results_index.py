@@ -0,0 +1,202 @@
+import random
+
+import pytest
+
+from results_index import CityResultIndex, SortedList
+from tasks import DataAnalyzingTask
+
+
+def test_range_queries(results_index):
+    # GIVEN индекс по рассчитанным данным городов.
+    # THEN запросы по диапазонам возвращают нужные города.
+
+    index = results_index
+    assert index.temp_range('2022-05-28', 15, 18) == ['MOSCOW', 'LONDON'], (
+        'Проверьте, что `temp_range` включает границы диапазона.'
+    )
+    assert index.dry_range('2022-05-28', 10) == ['CAIRO'], (
+        'Проверьте, что `dry_range` отбирает города по сухим часам.'
+    )
+    assert index.warmest('2022-05-28', 2) == ['CAIRO', 'LONDON'], (
+        'Проверьте, что `warmest` отбирает самые тёплые города.'
+    )
+    assert index.warmest('2022-05-29', 2, min_dry=9) == ['CAIRO'], (
+        'Проверьте, что `warmest` отбирает самые тёплые сухие города.'
+    )
+    assert index.temp_range('2022-05-29') == ['MOSCOW', 'CAIRO'], (
+        'Проверьте, что дни без данных не попадают в запросы по дате.'
+    )
+    assert index.dry_every_day(8) == ['MOSCOW', 'CAIRO'], (
+        'Проверьте, что `dry_every_day` считает день без данных '
+        'днём без сухих часов.'
+    )
+
+
+def test_zero_temperature(city_result):
+    # GIVEN день со средней температурой 0.0 °C и сухими часами.
+    # THEN такой день остаётся в индексе.
+
+    index = CityResultIndex()
+    index.add(city_result('OSLO', [('2022-05-28', 0.0, 11)]))
+    assert index.temp_range('2022-05-28', -1, 1) == ['OSLO'], (
+        'Проверьте, что день с 0.0 °C попадает в `temp_range`.'
+    )
+    assert '2022-05-28' in index.city('OSLO'), (
+        'Проверьте, что день с 0.0 °C возвращается в `city`.'
+    )
+    assert index.dry_every_day(11) == ['OSLO'], (
+        'Проверьте, что день с 0.0 °C учитывается в `dry_every_day`.'
+    )
+
+    index.add(city_result('BERGEN', [('2022-05-28', 0.0, 0)]))
+    assert index.temp_range('2022-05-28', 0, 0) == ['BERGEN', 'OSLO'], (
+        'Проверьте, что день с 0.0 °C без сухих часов не считается '
+        'днём без данных.'
+    )
+    assert index.city('BERGEN') == {
+        '2022-05-28': {'date': '2022-05-28', 'avg_temp': 0.0, 'count_dry': 0}
+    }, 'Проверьте, что `city` возвращает день с 0.0 °C без сухих часов.'
+
+
+def test_update(results_index, city_result):
+    # GIVEN новые данные для города, который уже есть в индексе.
+    # THEN старые записи города заменяются новыми.
+
+    index = results_index
+    index.add(city_result(
+        'MOSCOW', [('2022-05-28', 40.0, 1), ('2022-05-29', 17.0, 8)]
+    ))
+    assert len(index) == 3, (
+        'Проверьте, что повторное добавление не создаёт новый город.'
+    )
+    assert index.warmest('2022-05-28', 1) == ['MOSCOW'], (
+        'Проверьте, что `add` обновляет данные города.'
+    )
+    assert index.dry_every_day(8) == ['CAIRO'], (
+        'Проверьте, что `add` обновляет минимум сухих часов города.'
+    )
+    assert index.city('MOSCOW')['2022-05-28']['avg_temp'] == 40.0, (
+        'Проверьте, что `city` возвращает новые данные города.'
+    )
+    index.remove('MOSCOW')
+    assert 'MOSCOW' not in index, (
+        'Проверьте, что `remove` удаляет город.'
+    )
+    assert index.temp_range('2022-05-28') == ['LONDON', 'CAIRO'], (
+        'Проверьте, что `remove` удаляет все записи города.'
+    )
+
+
+def test_update_in_place(city_result):
+    # GIVEN данные города изменены на месте и добавлены повторно.
+    # THEN город остаётся в индексе один раз с новыми значениями.
+
+    index = CityResultIndex()
+    result = city_result('A', [('d', 10.0, 5)])
+    index.add(result)
+    result['data'][0]['avg_temp'] = 20.0
+    index.add(result)
+    assert index.temp_range('d') == ['A'], (
+        'Проверьте, что индекс хранит копию данных города.'
+    )
+    assert index.temp_range('d', 15) == ['A'], (
+        'Проверьте, что повторное добавление обновляет значения.'
+    )
+
+
+def test_duplicate_date(results_index, city_result):
+    # GIVEN в данных города дата повторяется.
+    # THEN данные отклоняются, индекс не меняется.
+
+    with pytest.raises(ValueError):
+        results_index.add(city_result(
+            'MOSCOW', [('2022-05-28', 20.0, 1), ('2022-05-28', 21.0, 2)]
+        ))
+    assert results_index.temp_range('2022-05-28', 15, 15) == ['MOSCOW'], (
+        'Проверьте, что ошибочные данные не меняют индекс.'
+    )
+
+
+def test_from_results(city_result):
+    # GIVEN результаты для большого числа городов.
+    # THEN индекс, построенный сразу, совпадает с построенным по одному.
+
+    rnd = random.Random(0)
+    dates = [f'2022-05-{day}' for day in range(26, 31)]
+    results = [
+        city_result(f'city_{number}', [
+            (date, round(rnd.uniform(-20, 40), 1), rnd.randint(0, 11))
+            for date in dates
+        ])
+        for number in range(3000)
+    ]
+    bulk = CityResultIndex.from_results(results)
+    incremental = CityResultIndex()
+    for result in results:
+        incremental.add(result)
+
+    assert len(bulk) == len(results), (
+        'Проверьте, что `from_results` добавляет все города.'
+    )
+    for date in dates:
+        assert len(bulk.temp_range(date)) == len(results), (
+            'Проверьте, что `from_results` индексирует все дни.'
+        )
+        assert bulk.temp_range(date, 0, 10) == (
+            incremental.temp_range(date, 0, 10)
+        ), 'Проверьте, что `from_results` совпадает с `add`.'
+        assert bulk.warmest(date, 10, min_dry=8) == (
+            incremental.warmest(date, 10, min_dry=8)
+        ), 'Проверьте, что `warmest` совпадает для обоих способов.'
+    assert bulk.dry_every_day(6) == incremental.dry_every_day(6), (
+        'Проверьте, что `dry_every_day` совпадает для обоих способов.'
+    )
+
+
+def test_sorted_list():
+    # GIVEN случайные вставки и удаления в SortedList.
+    # THEN порядок и диапазоны совпадают с отсортированным списком.
+
+    rnd = random.Random(1)
+    items = SortedList()
+    expected = []
+    for _ in range(5000):
+        value = rnd.randint(0, 1000)
+        items.add(value)
+        expected.append(value)
+    for value in expected[::3]:
+        items.remove(value)
+    expected = sorted(expected[1::3] + expected[2::3])
+
+    assert list(items) == expected, (
+        'Проверьте, что `SortedList` сохраняет порядок элементов.'
+    )
+    assert list(reversed(items)) == expected[::-1], (
+        'Проверьте обратный обход `SortedList`.'
+    )
+    assert list(items.irange(100, 200)) == [
+        value for value in expected if 100 <= value <= 200
+    ], 'Проверьте, что `irange` включает границы диапазона.'
+
+
+def test_build_index(city_result, get_dataanalyzingtask):
+    # GIVEN рассчитанные данные городов.
+    # THEN DataAnalyzingTask строит по ним индекс и пополняет переданный.
+
+    results = [
+        city_result('MOSCOW', [('2022-05-28', 15.0, 9)]),
+        city_result('CAIRO', [('2022-05-28', 33.0, 11)]),
+    ]
+    index = get_dataanalyzingtask.build_index(results)
+    assert get_dataanalyzingtask.index is index, (
+        'Проверьте, что `build_index` сохраняет индекс в `index`.'
+    )
+    assert index.warmest('2022-05-28', 1, min_dry=9) == ['CAIRO'], (
+        'Проверьте, что `build_index` добавляет все города.'
+    )
+    index = DataAnalyzingTask().build_index(
+        [city_result('ROMA', [('2022-05-28', 25.0, 10)])], index
+    )
+    assert index.dry_range('2022-05-28', 9) == ['MOSCOW', 'ROMA', 'CAIRO'], (
+        'Проверьте, что `build_index` пополняет переданный индекс.'
+    )